@@ -1,18 +1,30 @@
+import os
+
+# Variables lues à l'import de TensorFlow : pas de sondage GPU ni de logs verbeux
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+
 import streamlit as st
-import tensorflow as tf
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
-from PIL import Image
+from PIL import Image, ImageFile
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
 import joblib
+import xgboost as xgb
 import time
-import pandas as pd
+import html
 import io
+import re
 import base64
 from datetime import datetime
-import hashlib
+import xxhash
+from inference import (
+    ALL_CITIES, ALL_COUNTRIES, ALL_MONTHS, CITY_CODES, IMAGE_SIZE, POP_FACTOR, POPULATION_SIZES,
+    forecast_months, predict_batch, radar_values, resize_pixels, scale_case, scale_cases
+)
+
+# Images téléversées : dimension maximale traitée, et tolérance aux fichiers tronqués
+MAX_UPLOAD_DIM = 1024
+ImageFile.LOAD_TRUNCATED_IMAGES = True
 
 # Configuration optimisée de la page
 st.set_page_config(
@@ -22,42 +34,184 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ==================== BLOCS HTML ====================
+
+# Blocs statiques et gabarits (remplis par format_map) partagés par les modules
+METRIC_CARD_HTML = """
+<div class="metric-card">
+    <div class="metric-label">{label}</div>
+    <div class="metric-value" style="color: {color};">{value}</div>
+</div>
+"""
+
+FORECAST_CARD_HTML = """
+<div class="result-card result-forecast">
+    🌍 <strong>PRÉVISION ÉPIDÉMIOLOGIQUE</strong><br><br>
+    <strong>{city}, {country}</strong><br>
+    <strong>Mois: {month}</strong><br><br>
+    <span style="font-size: 3.5rem; font-weight: 800;">{prediction}</span><br>
+    <span style="font-size: 1.2rem;">cas estimés de malaria 🦠</span><br><br>
+    <strong>Niveau de Risque: {risk_level}</strong><br><br>
+    <span style="font-size: 0.9rem;">Prévision générée le {timestamp}</span>
+</div>
+"""
+
+FORECAST_HEADER_HTML = """
+<div class="premium-card">
+    <h2 class="card-title" style="text-align: center;">🌍 Module de Prévision Épidémiologique</h2>
+    <p class="card-text" style="text-align: center;">
+        Système de prédiction avancé utilisant <span class="highlight">XGBoost</span> et des <span class="highlight">données climatiques</span> 
+        pour estimer la propagation de la malaria
+    </p>
+</div>
+"""
+
+FORECAST_SETUP_HTML = """
+<div class="premium-card">
+    <h3 class="card-title" style="text-align: center;">📝 Configuration des Paramètres</h3>
+    <p class="card-text" style="text-align: center;">
+        Saisissez les données climatiques et épidémiologiques pour générer une prévision précise
+    </p>
+</div>
+"""
+
+DASHBOARD_HEADER_HTML = """
+<div class="premium-card">
+    <h2 class="card-title" style="text-align: center;">📊 Dashboard Analytics Avancé</h2>
+    <p class="card-text" style="text-align: center;">
+        Surveillance en temps réel des performances et métriques du système d'intelligence artificielle
+    </p>
+</div>
+"""
+
+FOOTER_HTML = """
+<div class="premium-card" style="margin-top: 2rem;">
+    <p class="card-text" style="text-align: center; font-size: 0.95rem;">
+        <span class="highlight">🔬 Malaria AI Detective</span> - Développé avec   CHE .<br>
+        <strong>Version 2.0 </strong> | Intelligence Artificielle de Pointe | Diagnostics Ultra-Précis | 
+        <span style="color: var(--success);">Sur la base des expériences internationales, nous visons à promouvoir le développement de la Mauritanie</span>
+    </p>
+</div>
+"""
+
 # ==================== FONCTIONS UTILITAIRES ====================
 
 def initialize_session_state():
     """Initialise proprement le session state"""
     default_values = {
         'analysis_done': False,
-        'prediction_result': None,
-        'confidence_score': None,
-        'analyzed_image_hash': None,
+        'prediction_results': None,
+        'confidence_scores': None,
+        'analyzed_image_hashes': None,
         'analysis_timestamp': None,
+        'result_html': None,
         'current_tab': 'detection',
         'forecast_done': False,
         'forecast_result': None,
+        'last_forecast_key': None,
         'models_loaded': False
     }
     
     for key, value in default_values.items():
         if key not in st.session_state:
             st.session_state[key] = value
+    
+    if '_sidebar_static_html' not in st.session_state:
+        st.session_state._sidebar_static_html = build_sidebar_html()
+
+def build_sidebar_html():
+    """Construit le bloc statique du guide rapide de la sidebar"""
+    return """
+<div class="sidebar-card">
+    <h4 style="color: white; margin-bottom: 1rem; font-weight: 600;">📚 Guide Rapide</h4>
+    <div style="color: rgba(255, 255, 255, 0.9); font-size: 0.9rem; line-height: 1.6;">
+        <div style="margin-bottom: 1rem; padding: 0.8rem; background: rgba(255, 255, 255, 0.1); border-radius: 8px;">
+            <strong style="color: #4ade80;">🔬 Module Détection</strong><br>
+            <span style="font-size: 0.85rem;">• Upload d'images haute résolution<br>
+            • Analyse par réseau de neurones convolutionnel<br>
+            • Résultats en temps réel avec score de confiance</span>
+        </div>
+        <div style="margin-bottom: 1rem; padding: 0.8rem; background: rgba(255, 255, 255, 0.1); border-radius: 8px;">
+            <strong style="color: #60a5fa;">🌍 Module Prévision</strong><br>
+            <span style="font-size: 0.85rem;">• Modélisation climatique avancée<br>
+            • Algorithmes XGBoost optimisés<br>
+            • Prédictions épidémiologiques précises</span>
+        </div>
+        <div style="padding: 0.8rem; background: rgba(255, 255, 255, 0.1); border-radius: 8px;">
+            <strong style="color: #fbbf24;">📊 Analytics Dashboard</strong><br>
+            <span style="font-size: 0.85rem;">• Métriques de performance en temps réel<br>
+            • Visualisations interactives<br>
+            • Rapports d'analyse détaillés</span>
+        </div>
+    </div>
+</div>
+"""
+
+def build_dashboard_static():
+    """Construit les cartes de métriques et le tableau de performance du tableau de bord"""
+    dashboard_metrics = [
+        ("🔬 Images Analysées", "1,387", "#2563eb"),
+        ("🎯 Précision Globale", "96.8%", "#059669"),
+        ("🌍 Prévisions Générées", "1,042", "#d97706"),
+        ("🏥 Cas Détectés", "189", "#dc2626")
+    ]
+    
+    performance_data = {
+        'Modèle': ['CNN MobileNet', 'XGBoost Forecast', 'Ensemble Hybrid'],
+        'Précision': ['96.8%', '89.2%', '93.1%'],
+        'Rappel': ['95.4%', '86.7%', '91.3%'],
+        'F1-Score': ['96.1%', '87.9%', '92.2%'],
+        'Temps d\'Exécution': ['2.1s', '1.8s', '3.9s'],
+        'Statut': ['🟢 Actif', '🟢 Actif', '🟡 Test']
+    }
+    
+    return {
+        'metrics_html': [METRIC_CARD_HTML.format_map({'label': label, 'value': value, 'color': color})
+                         for label, value, color in dashboard_metrics],
+        'performance': performance_data
+    }
 
-def get_image_hash(image):
-    """Génère un hash unique pour une image"""
-    return hashlib.md5(image.tobytes()).hexdigest()
+def get_image_hash(image_bytes):
+    """Génère une empreinte rapide et exacte du fichier téléversé"""
+    return xxhash.xxh3_64_intdigest(image_bytes)
 
 def reset_analysis_state():
     """Remet à zéro l'état d'analyse"""
     st.session_state.analysis_done = False
-    st.session_state.prediction_result = None
-    st.session_state.confidence_score = None
-    st.session_state.analyzed_image_hash = None
+    st.session_state.prediction_results = None
+    st.session_state.confidence_scores = None
+    st.session_state.analyzed_image_hashes = None
     st.session_state.analysis_timestamp = None
+    st.session_state.result_html = None
 
 def reset_forecast_state():
     """Remet à zéro l'état de prévision"""
     st.session_state.forecast_done = False
     st.session_state.forecast_result = None
+    st.session_state.last_forecast_key = None
+
+def load_compiled_forecaster():
+    """Charge les arbres compilés par compile_forecast_model.py, si tl2cgen est installé"""
+    if not os.path.exists("xgb_malaria.so"):
+        return None
+    try:
+        import tl2cgen
+    except ImportError:
+        return None
+    return tl2cgen.Predictor("xgb_malaria.so", nthread=1)
+
+def convert_to_daal(booster):
+    """Convertit le Booster en modèle oneDAL si daal4py est installé ; renvoie (modèle, erreur)"""
+    try:
+        import daal4py
+    except ImportError:
+        # Dépendance optionnelle absente : le Booster reste le moteur
+        return booster, None
+    try:
+        return daal4py.mb.convert_model(booster), None
+    except Exception as e:
+        # Conversion refusée : repli sur le Booster, signalé dans la sidebar
+        return booster, f"Prévision (oneDAL): {str(e)}"
 
 @st.cache_resource(show_spinner=False)
 def load_ai_models():
@@ -65,45 +219,123 @@ def load_ai_models():
     models_status = {
         'detection_model': None,
         'forecast_model': None,
-        'detection_loaded': False,
+        'detection_loaded': None,  # None : détecteur pas encore demandé
         'forecast_loaded': False,
         'errors': []
     }
     
     try:
-        models_status['detection_model'] = load_model("malaria_detector_mobilenet.h5")
-        models_status['detection_loaded'] = True
-    except Exception as e:
-        models_status['errors'].append(f"Détection: {str(e)}")
-    
-    try:
-        models_status['forecast_model'] = joblib.load("xgb_malaria_forecast_model.joblib")
+        forecast_model = load_compiled_forecaster()
+        if forecast_model is None:
+            if os.path.exists("xgb_malaria.ubj"):
+                # Booster natif produit par export_forecast_model.py
+                forecast_model = xgb.Booster()
+                forecast_model.load_model("xgb_malaria.ubj")
+            else:
+                forecast_model = joblib.load("xgb_malaria_forecast_model.joblib").get_booster()
+            # Prédictions de quelques lignes : un seul thread évite de réveiller le pool OpenMP à chaque clic
+            forecast_model.set_param({"nthread": 1})
+            forecast_model, daal_error = convert_to_daal(forecast_model)
+            if daal_error:
+                models_status['errors'].append(daal_error)
+        # Préchauffage par le chemin réel : prédiction en lot puis compilation Numba du post-traitement
+        monthly_base = forecast_months(forecast_model, 0, 0, 0.0, 0.0, 0.0, 0)
+        scale_case(monthly_base[0], 1.0, 1.0)
+        scale_cases(monthly_base, 1.0, 1.0)
+        models_status['forecast_model'] = forecast_model
         models_status['forecast_loaded'] = True
     except Exception as e:
         models_status['errors'].append(f"Prévision: {str(e)}")
     
     return models_status
 
-def process_image_prediction(image, model):
-    """Traite la prédiction d'image de manière optimisée"""
+@st.cache_resource(show_spinner=False)
+def load_detection_model():
+    """Charge le détecteur ; TensorFlow n'est importé qu'à ce moment"""
     try:
-        IMAGE_SIZE = (128, 128)
-        image_resized = image.resize(IMAGE_SIZE)
-        img_array = img_to_array(image_resized) / 255.0
-        img_array = np.expand_dims(img_array, axis=0)
+        import tensorflow as tf
+        from tensorflow.keras.models import load_model
         
-        prediction = model.predict(img_array, verbose=0)[0][0]
-        confidence = max(prediction, 1 - prediction)
+        if os.path.exists("malaria_detector_mobilenet_int8.tflite"):
+            # Modèle int8 produit par quantize_detector.py (noyaux int8 XNNPACK)
+            detector = tf.lite.Interpreter(model_path="malaria_detector_mobilenet_int8.tflite")
+            detector.allocate_tensors()
+        else:
+            keras_model = load_model("malaria_detector_mobilenet.h5")
+            try:
+                # Conversion unique en TFLite : invoke() évite le surcoût de predict() en batch 1
+                converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+                converter.optimizations = [tf.lite.Optimize.DEFAULT]
+                detector = tf.lite.Interpreter(model_content=converter.convert())
+                detector.allocate_tensors()
+            except Exception:
+                # Repli si la conversion échoue : graphe Keras compilé par XLA
+                detector = tf.function(
+                    lambda x: keras_model(x, training=False),
+                    jit_compile=True,
+                    input_signature=[tf.TensorSpec((None, *IMAGE_SIZE, 3), tf.float32)]
+                )
+        # Inférence à blanc : compilation Numba/XLA et initialisation des noyaux payées au chargement
+        predict_batch(detector, [np.zeros((*IMAGE_SIZE, 3), dtype=np.uint8)])
+        return detector, None
+    except Exception as e:
+        return None, f"Détection: {str(e)}"
+
+def get_models(with_detection):
+    """Assemble l'état des modèles, en ne chargeant le détecteur que si nécessaire"""
+    models_status = dict(load_ai_models())
+    if with_detection:
+        detection_model, error = load_detection_model()
+        models_status['detection_model'] = detection_model
+        models_status['detection_loaded'] = detection_model is not None
+        if error:
+            models_status['errors'] = models_status['errors'] + [error]
+    return models_status
+
+def open_upload(image_bytes, draft_size):
+    """Ouvre une image téléversée en RGB, décodée à échelle réduite et plafonnée à 1024 px"""
+    image = Image.open(io.BytesIO(image_bytes))
+    # Décodage JPEG directement à l'échelle réduite (DCT 1/2, 1/4 ou 1/8)
+    image.draft("RGB", draft_size)
+    image = image.convert("RGB")
+    if max(image.size) > MAX_UPLOAD_DIM:
+        image.thumbnail((MAX_UPLOAD_DIM, MAX_UPLOAD_DIM), Image.BILINEAR)
+    return image
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_preview(image_bytes):
+    """Prépare une seule fois l'aperçu JPEG (≤ 800×800), la taille d'origine et l'empreinte d'une image"""
+    original_size = Image.open(io.BytesIO(image_bytes)).size
+    image = open_upload(image_bytes, (800, 800))
+    image.thumbnail((800, 800))
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue(), original_size, get_image_hash(image_bytes)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def preprocess_image(image_bytes):
+    """Décode et redimensionne une image une seule fois pour un contenu donné"""
+    return resize_pixels(open_upload(image_bytes, (256, 256)))
+
+def process_image_prediction(images_bytes, model):
+    """Traite en un seul lot la prédiction de plusieurs images"""
+    try:
+        predictions = predict_batch(model, [preprocess_image(image_bytes) for image_bytes in images_bytes])
+        confidences = np.maximum(predictions, 1 - predictions)
         
-        return prediction, confidence, None
+        return predictions.tolist(), confidences.tolist(), None
     except Exception as e:
         return None, None, str(e)
 
-def create_confidence_gauge(confidence_value):
-    """Crée un gauge de confiance optimisé"""
+@st.cache_resource(show_spinner=False)
+def build_gauge_template():
+    """Construit une seule fois le squelette du gauge de confiance"""
+    # Plotly n'est importé qu'au premier graphique construit (sys.modules le garde ensuite)
+    import plotly.graph_objects as go
     fig = go.Figure(go.Indicator(
         mode="gauge+number+delta",
-        value=confidence_value * 100,
+        value=0,
         domain={'x': [0, 1], 'y': [0, 1]},
         title={'text': "🎯 Confiance IA", 'font': {'color': '#1f2937', 'size': 20, 'family': 'Inter'}},
         number={'font': {'color': '#1f2937', 'size': 32, 'family': 'Inter'}},
@@ -136,369 +368,263 @@ def create_confidence_gauge(confidence_value):
         margin=dict(l=20, r=20, t=40, b=20)
     )
     
-    return fig
+    return fig.to_dict()
 
-# ==================== CSS OPTIMISÉ ====================
+@st.cache_resource(show_spinner=False)
+def register_plotly_template():
+    """Enregistre une seule fois le thème Plotly partagé par les graphiques de prévision et du dashboard"""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    # Thème Plotly par défaut, complété par le fond et les polices de l'application
+    template = go.layout.Template(pio.templates['plotly'])
+    template.layout.update(
+        paper_bgcolor='rgba(248, 250, 252, 0.95)',
+        plot_bgcolor='rgba(248, 250, 252, 0.95)',
+        font={'color': '#1f2937', 'family': 'Inter'},
+        title_font={'color': '#1f2937', 'size': 18, 'family': 'Inter'}
+    )
+    pio.templates['premium'] = template
+    return 'premium'
 
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
-    
-    :root {
-        --primary: #2563eb;
-        --primary-dark: #1d4ed8;
-        --secondary: #06b6d4;
-        --success: #059669;
-        --warning: #d97706;
-        --danger: #dc2626;
-        --text-primary: #111827;
-        --text-secondary: #6b7280;
-        --bg-primary: #ffffff;
-        --bg-secondary: #f9fafb;
-        --border: #e5e7eb;
-        --shadow: 0 10px 15px -3px rgb(0 0 0 / 0.1);
-        --shadow-lg: 0 20px 25px -5px rgb(0 0 0 / 0.1);
-        --radius: 16px;
-        --radius-lg: 24px;
-    }
-    
-    /* Base */
-    .stApp {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Containers */
-    .main-container {
-        background: rgba(255, 255, 255, 0.98);
-        backdrop-filter: blur(20px);
-        border-radius: var(--radius-lg);
-        padding: 2rem;
-        margin: 1rem 0;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        box-shadow: var(--shadow-lg);
-        transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-    }
-    
-    .main-container:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 25px 50px -12px rgb(0 0 0 / 0.25);
-    }
-    
-    /* Header */
-    .hero-header {
-        text-align: center;
-        font-size: 4rem;
-        font-weight: 800;
-        background: linear-gradient(135deg, var(--primary), var(--secondary), var(--success));
-        background-size: 200% 200%;
-        animation: gradientFlow 8s ease infinite;
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        margin-bottom: 1rem;
-        letter-spacing: -0.03em;
-        line-height: 1.1;
-    }
-    
-    @keyframes gradientFlow {
-        0%, 100% { background-position: 0% 50%; }
-        50% { background-position: 100% 50%; }
-    }
-    
-    /* Cards Premium */
-    .premium-card {
-        background: rgba(255, 255, 255, 0.95);
-        border-radius: var(--radius);
-        padding: 2rem;
-        margin: 1rem 0;
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        box-shadow: var(--shadow);
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .premium-card::before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        height: 4px;
-        background: linear-gradient(90deg, var(--primary), var(--secondary));
-        border-radius: var(--radius) var(--radius) 0 0;
-    }
-    
-    .premium-card:hover {
-        transform: translateY(-4px);
-        box-shadow: var(--shadow-lg);
-        border-color: rgba(37, 99, 235, 0.3);
-    }
-    
-    /* Typography */
-    .card-title {
-        color: var(--text-primary);
-        font-size: 1.5rem;
-        font-weight: 600;
-        margin-bottom: 1rem;
-        letter-spacing: -0.02em;
-    }
-    
-    .card-text {
-        color: var(--text-secondary);
-        font-size: 1rem;
-        line-height: 1.6;
-        font-weight: 400;
-    }
-    
-    .highlight {
-        color: var(--text-primary);
-        font-weight: 600;
-    }
-    
-    /* Buttons Premium */
-    .stButton > button {
-        background: linear-gradient(135deg, var(--primary), var(--primary-dark));
-        border: none;
-        border-radius: 12px;
-        color: white;
-        font-weight: 600;
-        font-size: 1rem;
-        padding: 0.75rem 2rem;
-        transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        box-shadow: var(--shadow);
-        letter-spacing: 0.02em;
-        position: relative;
-        overflow: hidden;
-    }
-    
-    .stButton > button:before {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: -100%;
-        width: 100%;
-        height: 100%;
-        background: linear-gradient(90deg, transparent, rgba(255,255,255,0.2), transparent);
-        transition: left 0.5s;
-    }
-    
-    .stButton > button:hover:before {
-        left: 100%;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: var(--shadow-lg);
-        background: linear-gradient(135deg, var(--primary-dark), var(--primary));
-    }
-    
-    /* Results Cards */
-    .result-card {
-        padding: 2.5rem;
-        border-radius: var(--radius);
-        text-align: center;
-        color: white;
-        box-shadow: var(--shadow-lg);
-        position: relative;
-        overflow: hidden;
-        font-weight: 600;
-    }
-    
-    .result-positive {
-        background: linear-gradient(135deg, var(--danger), #ef4444);
-        animation: pulseRed 3s ease-in-out infinite;
-    }
-    
-    .result-negative {
-        background: linear-gradient(135deg, var(--success), #10b981);
-        animation: pulseGreen 3s ease-in-out infinite;
-    }
-    
-    .result-forecast {
-        background: linear-gradient(135deg, var(--warning), #f59e0b);
-        animation: pulseOrange 3s ease-in-out infinite;
-    }
-    
-    @keyframes pulseRed {
-        0%, 100% { box-shadow: 0 0 0 0 rgba(220, 38, 38, 0.4); }
-        50% { box-shadow: 0 0 0 20px rgba(220, 38, 38, 0); }
-    }
+@st.cache_data(show_spinner=False)
+def build_radar_figure(risk_values):
+    """Construit le radar des facteurs de risque pour un jeu de valeurs donné"""
+    import plotly.graph_objects as go
+    fig = go.Figure(data=go.Scatterpolar(
+        r=list(risk_values),
+        theta=['Température', 'Humidité', 'Précipitations', 'Cas Précédents'],
+        fill='toself',
+        fillcolor='rgba(37, 99, 235, 0.3)',
+        line=dict(color='#2563eb', width=4),
+        name='Facteurs de Risque'
+    ))
     
-    @keyframes pulseGreen {
-        0%, 100% { box-shadow: 0 0 0 0 rgba(5, 150, 105, 0.4); }
-        50% { box-shadow: 0 0 0 20px rgba(5, 150, 105, 0); }
-    }
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True, range=[0, 100],
+                tickfont=dict(color='#1f2937', size=12),
+                gridcolor='#e5e7eb'
+            ),
+            angularaxis=dict(
+                tickfont=dict(color='#1f2937', size=14, family='Inter'),
+                rotation=90
+            )
+        ),
+        showlegend=False,
+        title={'text': "🎯 Analyse des Facteurs de Risque", 'x': 0.5},
+        template=register_plotly_template(),
+        height=350
+    )
     
-    @keyframes pulseOrange {
-        0%, 100% { box-shadow: 0 0 0 0 rgba(217, 119, 6, 0.4); }
-        50% { box-shadow: 0 0 0 20px rgba(217, 119, 6, 0); }
-    }
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_monthly_forecast_figure(monthly_cases, selected_month):
+    """Construit la courbe des cas prévus sur tous les mois, mois sélectionné mis en évidence"""
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Scatter(
+        x=ALL_MONTHS, y=list(monthly_cases), mode='lines+markers', name='Cas Prévus',
+        line=dict(color='#2563eb', width=4),
+        marker=dict(size=[16 if m == selected_month else 10 for m in ALL_MONTHS], color='#2563eb')
+    ))
     
-    /* Metrics */
-    .metric-card {
-        background: rgba(255, 255, 255, 0.95);
-        border-radius: var(--radius);
-        padding: 1.5rem;
-        text-align: center;
-        border: 1px solid var(--border);
-        box-shadow: var(--shadow);
-        transition: all 0.3s ease;
-    }
+    fig.update_layout(
+        title={'text': "📈 Prévision sur la Saison", 'x': 0.5},
+        template=register_plotly_template(),
+        height=320,
+        margin=dict(t=50, b=20, l=20, r=20)
+    )
     
-    .metric-card:hover {
-        transform: translateY(-3px);
-        box-shadow: var(--shadow-lg);
-    }
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_detection_trend_figure():
+    """Construit le graphique d'évolution des détections (données statiques)"""
+    import plotly.graph_objects as go
+    months = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Juin']
+    positive_cases = [52, 41, 63, 48, 44, 51]
+    negative_cases = [168, 175, 159, 172, 169, 163]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=months, y=positive_cases, mode='lines+markers', name='Cas Positifs', line=dict(color='#dc2626', width=4), marker=dict(size=10)))
+    fig.add_trace(go.Scatter(x=months, y=negative_cases, mode='lines+markers', name='Cas Négatifs', line=dict(color='#059669', width=4), marker=dict(size=10)))
     
-    .metric-value {
-        font-size: 2.5rem;
-        font-weight: 700;
-        margin: 0.5rem 0;
-        background: linear-gradient(135deg, var(--primary), var(--secondary));
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
+    fig.update_layout(
+        template=register_plotly_template(),
+        height=320,
+        margin=dict(t=20, b=20, l=20, r=20),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
     
-    .metric-label {
-        font-size: 0.9rem;
-        font-weight: 500;
-        color: var(--text-secondary);
-        text-transform: uppercase;
-        letter-spacing: 0.05em;
-    }
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_geo_figure():
+    """Construit le graphique de répartition géographique (données statiques)"""
+    import plotly.graph_objects as go
+    countries = ['Sénégal', 'Mali', 'Guinée', 'Côte d\'Ivoire', 'Burkina Faso']
+    cases = [342, 289, 218, 267, 192]
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=countries, values=cases, hole=0.5,
+        marker_colors=['#2563eb', '#059669', '#d97706', '#dc2626', '#7c3aed'],
+        textinfo='label+percent', textfont_size=12
+    )])
     
-    /* Modern Loader */
-    .ai-loader {
-        display: inline-block;
-        width: 60px;
-        height: 60px;
-        border: 4px solid rgba(37, 99, 235, 0.2);
-        border-radius: 50%;
-        border-top-color: var(--primary);
-        animation: modernSpin 1s linear infinite;
-    }
+    fig.update_layout(
+        template=register_plotly_template(),
+        height=320,
+        margin=dict(t=20, b=20, l=20, r=20)
+    )
     
-    @keyframes modernSpin {
-        to { transform: rotate(360deg); }
-    }
+    return fig.to_dict()
+
+@st.cache_resource(show_spinner=False)
+def load_stylesheet():
+    """Lit et compacte une seule fois la feuille de style de l'application"""
+    with open("assets/style.css", encoding="utf-8") as f:
+        css = f.read()
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css).strip()
+    return f"<style>{css}</style>"
+
+def create_confidence_gauge(confidence_value):
+    """Crée un gauge de confiance à partir du squelette mis en cache"""
+    import plotly.graph_objects as go
+    fig = go.Figure(build_gauge_template())
+    fig.data[0].value = confidence_value * 100
+    return fig
+
+def build_detection_html(file_name, image_size, prediction, confidence, timestamp, elapsed):
+    """Construit une seule fois le HTML de la carte de résultat et des métriques d'une image"""
+    # Nom de fichier fourni par l'utilisateur : échappé avant d'être injecté dans le HTML
+    file_name = html.escape(file_name)
+    if prediction >= 0.5:
+        card_html = f"""
+        <div class="result-card result-positive">
+            🚨 <strong>DÉTECTION POSITIVE</strong><br><br>
+            <span style="font-size: 1.2rem;">Parasites de malaria détectés</span><br>
+            <span style="font-size: 1rem; opacity: 0.9;">Score de prédiction: {prediction:.3f}</span><br><br>
+            <strong style="font-size: 1.4rem;">⚡ CONSULTATION MÉDICALE URGENTE RECOMMANDÉE</strong><br><br>
+            <span style="font-size: 0.9rem;">{file_name} | Analyse effectuée le {timestamp.strftime('%d/%m/%Y à %H:%M')}</span>
+        </div>
+        """
+    else:
+        card_html = f"""
+        <div class="result-card result-negative">
+            ✅ <strong>RÉSULTAT NÉGATIF</strong><br><br>
+            <span style="font-size: 1.2rem;">Aucun parasite détecté</span><br>
+            <span style="font-size: 1rem; opacity: 0.9;">Score de prédiction: {prediction:.3f}</span><br><br>
+            <strong style="font-size: 1.4rem;">✨ Cellules d'apparence normale</strong><br><br>
+            <span style="font-size: 0.9rem;">{file_name} | Analyse effectuée le {timestamp.strftime('%d/%m/%Y à %H:%M')}</span>
+        </div>
+        """
     
-    /* Sidebar Premium */
-    .sidebar-card {
-        background: rgba(255, 255, 255, 0.2);
-        border-radius: var(--radius);
-        padding: 1.5rem;
-        margin-bottom: 1rem;
-        border: 1px solid rgba(255, 255, 255, 0.3);
-        backdrop-filter: blur(10px);
-    }
+    metrics = [
+        ("📈 Score IA", f"{prediction:.4f}", "#2563eb"),
+        ("🎯 Confiance", f"{confidence:.1%}", "#059669"),
+        ("📏 Résolution", f"{image_size[0]}×{image_size[1]}", "#d97706"),
+        ("⚡ Temps / image", f"{elapsed:.2f}s", "#7c3aed")
+    ]
+    metrics_html = [METRIC_CARD_HTML.format_map({'label': label, 'value': value, 'color': color})
+                    for label, value, color in metrics]
     
-    /* Radio Buttons */
-    .stRadio > div {
-        background: rgba(255, 255, 255, 0.15);
-        border-radius: var(--radius);
-        padding: 1rem;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }
+    return card_html, metrics_html
+
+def render_detection_results():
+    """Affiche les résultats figés dans le session state, image par image"""
+    for i, (confidence, (card_html, metrics_html)) in enumerate(zip(
+            st.session_state.confidence_scores, st.session_state.result_html)):
+        st.markdown("---")
+        
+        # Résultats principaux
+        col1, col2 = st.columns([3, 2])
+        
+        with col1:
+            st.markdown(card_html, unsafe_allow_html=True)
+        
+        with col2:
+            # Gauge de confiance
+            fig = create_confidence_gauge(confidence)
+            st.plotly_chart(fig, use_container_width=True, key=f"gauge_{i}")
+        
+        # Métriques détaillées
+        st.markdown("""
+        <div class="premium-card">
+            <h3 class="card-title" style="text-align: center;">📊 Analyse Détaillée</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        for col, metric_html in zip(st.columns(4), metrics_html):
+            with col:
+                st.markdown(metric_html, unsafe_allow_html=True)
     
-    .stRadio label {
-        color: white !important;
-        font-weight: 500 !important;
-        font-size: 1rem !important;
-    }
+    # Actions
+    st.markdown("---")
+    col1, col2, col3 = st.columns([1, 1, 1])
     
-    .stRadio div[role="radiogroup"] label {
-        padding: 1rem !important;
-        margin: 0.5rem 0 !important;
-        border-radius: 12px !important;
-        transition: all 0.3s ease !important;
-        background: rgba(255, 255, 255, 0.1) !important;
-        border: 1px solid transparent !important;
-    }
+    with col1:
+        if st.button("🔄 Nouvelle Analyse", use_container_width=True):
+            reset_analysis_state()
+            st.rerun()
     
-    .stRadio div[role="radiogroup"] label:hover {
-        background: rgba(255, 255, 255, 0.2) !important;
-        transform: translateX(8px) !important;
-        border-color: rgba(255, 255, 255, 0.3) !important;
-    }
+    with col2:
+        if st.button("📱 Partager Résultat", use_container_width=True):
+            st.success("🎉 Fonctionnalité de partage en développement!")
     
-    .stRadio div[role="radiogroup"] label[data-checked="true"] {
-        background: linear-gradient(135deg, var(--primary), var(--secondary)) !important;
-        color: white !important;
-        font-weight: 600 !important;
-        box-shadow: var(--shadow) !important;
-        transform: translateX(8px) !important;
-    }
+    with col3:
+        if st.button("📋 Exporter Rapport", use_container_width=True):
+            st.info("📄 Export PDF disponible prochainement!")
+
+def render_forecast_results(result):
+    """Affiche la prévision enregistrée dans le session state"""
+    st.markdown("---")
     
-    /* Upload Zone */
-    .upload-zone {
-        border: 3px dashed var(--secondary);
-        border-radius: var(--radius);
-        padding: 3rem 2rem;
-        text-align: center;
-        background: linear-gradient(135deg, rgba(6, 182, 212, 0.05), rgba(37, 99, 235, 0.05));
-        transition: all 0.3s ease;
-        color: var(--text-primary);
-    }
+    col1, col2 = st.columns([2, 3])
     
-    .upload-zone:hover {
-        border-color: var(--primary);
-        background: linear-gradient(135deg, rgba(37, 99, 235, 0.1), rgba(6, 182, 212, 0.1));
-        transform: scale(1.02);
-    }
+    with col1:
+        risk_level = "Faible" if result['prediction'] < 20 else "Modéré" if result['prediction'] < 50 else "Élevé"
+        st.markdown(FORECAST_CARD_HTML.format_map({
+            **result, 'risk_level': risk_level,
+            'timestamp': result['timestamp'].strftime('%d/%m/%Y à %H:%M')
+        }), unsafe_allow_html=True)
     
-    /* Status Indicators */
-    .status-online {
-        display: inline-flex;
-        align-items: center;
-        color: var(--success);
-        font-weight: 600;
-    }
+    with col2:
+        # Graphique radar des facteurs, construit une seule fois par combinaison de valeurs
+        st.plotly_chart(build_radar_figure(result['risk_values']), use_container_width=True)
     
-    .status-offline {
-        display: inline-flex;
-        align-items: center;
-        color: var(--danger);
-        font-weight: 600;
-    }
+    # Évolution sur l'ensemble des mois
+    st.plotly_chart(build_monthly_forecast_figure(result['monthly_cases'], result['month']), use_container_width=True)
     
-    .status-dot {
-        width: 8px;
-        height: 8px;
-        border-radius: 50%;
-        margin-right: 8px;
-        animation: statusPulse 2s infinite;
-    }
+    # Actions de prévision
+    st.markdown("---")
+    col1, col2, col3 = st.columns([1, 1, 1])
     
-    @keyframes statusPulse {
-        0%, 100% { opacity: 1; }
-        50% { opacity: 0.5; }
-    }
+    with col1:
+        if st.button("🔄 Nouvelle Prévision", use_container_width=True):
+            reset_forecast_state()
+            st.rerun()
     
-    /* Progress Enhancement */
-    .stProgress > div > div > div {
-        background: linear-gradient(90deg, var(--primary), var(--secondary));
-        border-radius: 10px;
-    }
+    with col2:
+        st.markdown(METRIC_CARD_HTML.format_map(
+            {'label': "🎯 Confiance du Modèle", 'value': f"{result['confidence_score']}%", 'color': "#2563eb"}
+        ), unsafe_allow_html=True)
     
-    /* Responsive */
-    @media (max-width: 768px) {
-        .hero-header { font-size: 2.5rem; }
-        .main-container { padding: 1.5rem; margin: 0.5rem; }
-        .premium-card { padding: 1.5rem; }
-    }
-</style>
-""", unsafe_allow_html=True)
+    with col3:
+        st.markdown(METRIC_CARD_HTML.format_map(
+            {'label': "📊 Précision Historique", 'value': "89.2%", 'color': "#059669"}
+        ), unsafe_allow_html=True)
+
+# ==================== CSS OPTIMISÉ ====================
+
+st.markdown(load_stylesheet(), unsafe_allow_html=True)
 
 # ==================== INITIALISATION ====================
 
 # Initialiser le session state
 initialize_session_state()
 
-# Charger les modèles
-models = load_ai_models()
-
 # ==================== HEADER PRINCIPAL ====================
 
 st.markdown('<h1 class="hero-header">🔬 Malaria AI Detective</h1>', unsafe_allow_html=True)
@@ -529,58 +655,37 @@ with st.sidebar:
         key="main_navigation"
     )
     
+    # Charger les modèles (TensorFlow uniquement pour le module de détection)
+    models = get_models(selected_feature == "🔬 Détection par Image")
+    
     # Statut des modèles avec indicateurs visuels
-    st.markdown("""
-    <div class="sidebar-card">
-        <h4 style="color: white; margin-bottom: 1rem; font-weight: 600;">🤖 Statut des Modèles IA</h4>
-    </div>
-    """, unsafe_allow_html=True)
+    status_colors = {'online': '#059669', 'standby': '#9ca3af', 'offline': '#dc2626'}
+    status_texts = {'online': "🟢 Opérationnel", 'standby': "⚪ En veille", 'offline': "🔴 Indisponible"}
     
-    detection_status = "online" if models['detection_loaded'] else "offline"
+    detection_status = "standby" if models['detection_loaded'] is None else "online" if models['detection_loaded'] else "offline"
     forecast_status = "online" if models['forecast_loaded'] else "offline"
     
-    detection_text = "🟢 Opérationnel" if models['detection_loaded'] else "🔴 Indisponible"
-    forecast_text = "🟢 Opérationnel" if models['forecast_loaded'] else "🔴 Indisponible"
+    detection_text = status_texts[detection_status]
+    forecast_text = status_texts[forecast_status]
     
     st.markdown(f"""
+    <div class="sidebar-card">
+        <h4 style="color: white; margin-bottom: 1rem; font-weight: 600;">🤖 Statut des Modèles IA</h4>
+    </div>
     <div style="color: white; padding: 0 1.5rem;">
         <div style="margin-bottom: 0.8rem;">
-            <span class="status-dot" style="background: {'#059669' if detection_status == 'online' else '#dc2626'};"></span>
+            <span class="status-dot" style="background: {status_colors[detection_status]};"></span>
             <strong>CNN Détection:</strong> {detection_text}
         </div>
         <div style="margin-bottom: 0.8rem;">
-            <span class="status-dot" style="background: {'#059669' if forecast_status == 'online' else '#dc2626'};"></span>
+            <span class="status-dot" style="background: {status_colors[forecast_status]};"></span>
             <strong>XGBoost Prévision:</strong> {forecast_text}
         </div>
     </div>
     """, unsafe_allow_html=True)
     
-    # Guide d'utilisation avancé
-    st.markdown("""
-    <div class="sidebar-card">
-        <h4 style="color: white; margin-bottom: 1rem; font-weight: 600;">📚 Guide Rapide</h4>
-        <div style="color: rgba(255, 255, 255, 0.9); font-size: 0.9rem; line-height: 1.6;">
-            <div style="margin-bottom: 1rem; padding: 0.8rem; background: rgba(255, 255, 255, 0.1); border-radius: 8px;">
-                <strong style="color: #4ade80;">🔬 Module Détection</strong><br>
-                <span style="font-size: 0.85rem;">• Upload d'images haute résolution<br>
-                • Analyse par réseau de neurones convolutionnel<br>
-                • Résultats en temps réel avec score de confiance</span>
-            </div>
-            <div style="margin-bottom: 1rem; padding: 0.8rem; background: rgba(255, 255, 255, 0.1); border-radius: 8px;">
-                <strong style="color: #60a5fa;">🌍 Module Prévision</strong><br>
-                <span style="font-size: 0.85rem;">• Modélisation climatique avancée<br>
-                • Algorithmes XGBoost optimisés<br>
-                • Prédictions épidémiologiques précises</span>
-            </div>
-            <div style="padding: 0.8rem; background: rgba(255, 255, 255, 0.1); border-radius: 8px;">
-                <strong style="color: #fbbf24;">📊 Analytics Dashboard</strong><br>
-                <span style="font-size: 0.85rem;">• Métriques de performance en temps réel<br>
-                • Visualisations interactives<br>
-                • Rapports d'analyse détaillés</span>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    # Guide d'utilisation avancé (HTML statique construit une fois par session)
+    st.markdown(st.session_state._sidebar_static_html, unsafe_allow_html=True)
     
     # Informations système
     if models['errors']:
@@ -624,188 +729,90 @@ if selected_feature == "🔬 Détection par Image":
         </div>
         """, unsafe_allow_html=True)
         
-        uploaded_file = st.file_uploader(
+        uploaded_files = st.file_uploader(
             "",
             type=["jpg", "jpeg", "png"],
-            help="Sélectionnez une image claire de cellules sanguines avec une bonne résolution",
+            accept_multiple_files=True,
+            help="Sélectionnez une ou plusieurs images claires de cellules sanguines avec une bonne résolution",
             key="image_uploader"
         )
     
-    if uploaded_file is not None:
+    if uploaded_files:
         try:
-            # Charger et valider l'image
-            image = Image.open(uploaded_file).convert("RGB")
-            current_image_hash = get_image_hash(image)
+            # Charger et valider les images
+            images_bytes = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+            previews = [load_preview(image_bytes) for image_bytes in images_bytes]
+            current_image_hashes = tuple(image_hash for _, _, image_hash in previews)
             
-            # Vérifier si c'est une nouvelle image
+            # Vérifier s'il s'agit de nouvelles images
             if (not st.session_state.analysis_done or 
-                st.session_state.analyzed_image_hash != current_image_hash):
+                st.session_state.analyzed_image_hashes != current_image_hashes):
                 reset_analysis_state()
             
-            # Affichage de l'image
+            # Affichage des images
             st.markdown("""
             <div class="premium-card">
-                <h3 class="card-title" style="text-align: center;">🖼️ Image Chargée</h3>
+                <h3 class="card-title" style="text-align: center;">🖼️ Images Chargées</h3>
             </div>
             """, unsafe_allow_html=True)
             
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                st.image(image, caption=f"Image: {uploaded_file.name} | Taille: {image.size[0]}×{image.size[1]}", use_column_width=True)
+            if len(uploaded_files) == 1:
+                preview_cols = [st.columns([1, 2, 1])[1]]
+            else:
+                preview_cols = st.columns(min(len(uploaded_files), 4))
             
-            # Interface d'analyse
+            for i, (uploaded_file, (preview, image_size, _)) in enumerate(zip(uploaded_files, previews)):
+                with preview_cols[i % len(preview_cols)]:
+                    st.image(preview, caption=f"Image: {uploaded_file.name} | Taille: {image_size[0]}×{image_size[1]}", use_container_width=True)
+            
+            # Interface d'analyse (effacée dès que les résultats sont disponibles)
             if not st.session_state.analysis_done:
-                st.markdown("""
-                <div class="premium-card">
-                    <h3 class="card-title" style="text-align: center;">🚀 Lancement de l'Analyse IA</h3>
-                    <p class="card-text" style="text-align: center;">
-                        Le système est prêt à analyser votre échantillon. 
-                        <span class="highlight">L'analyse prend environ 2-3 secondes.</span>
-                    </p>
-                </div>
-                """, unsafe_allow_html=True)
+                launch_placeholder = st.empty()
+                with launch_placeholder.container():
+                    st.markdown("""
+                    <div class="premium-card">
+                        <h3 class="card-title" style="text-align: center;">🚀 Lancement de l'Analyse IA</h3>
+                        <p class="card-text" style="text-align: center;">
+                            Le système est prêt à analyser vos échantillons. 
+                            <span class="highlight">Toutes les images sont analysées en un seul passage.</span>
+                        </p>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                col1, col2, col3 = st.columns([1, 1, 1])
-                with col2:
-                    if st.button("🧠 Analyser avec l'IA", use_container_width=True, type="primary"):
-                        # Interface d'analyse en cours
-                        analysis_container = st.container()
+                    col1, col2, col3 = st.columns([1, 1, 1])
+                    with col2:
+                        if st.button("🧠 Analyser avec l'IA", use_container_width=True, type="primary"):
+                            # Traitement réel, sans animation artificielle
+                            with st.spinner("🧠 Analyse IA en cours..."):
+                                start_time = time.perf_counter()
+                                predictions, confidences, error = process_image_prediction(images_bytes, models['detection_model'])
+                                # Temps moyen par image : le lot entier est analysé en un seul passage
+                                elapsed = (time.perf_counter() - start_time) / len(images_bytes)
                         
-                        with analysis_container:
-                            st.markdown("""
-                            <div class="premium-card">
-                                <h3 class="card-title" style="text-align: center;">🧠 Analyse IA en Cours</h3>
-                                <div style="text-align: center; margin: 2rem 0;">
-                                    <div class="ai-loader"></div>
-                                </div>
-                                <p class="card-text" style="text-align: center; font-weight: 600;">
-                                    Réseau de neurones en action...
-                                </p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Barre de progression
-                            progress_bar = st.progress(0)
-                            status_text = st.empty()
-                            
-                            processing_steps = [
-                                "🔍 Préprocessing de l'image...",
-                                "🧬 Segmentation des cellules...",
-                                "🤖 Analyse par CNN profond...",
-                                "📊 Calcul des probabilités...",
-                                "✨ Finalisation des résultats..."
-                            ]
-                            
-                            # Animation de progression
-                            for i in range(100):
-                                progress_bar.progress(i + 1)
-                                step_idx = min(i // 20, len(processing_steps) - 1)
-                                status_text.markdown(
-                                    f"<p class='card-text' style='text-align: center; font-weight: 600; color: var(--primary);'>{processing_steps[step_idx]}</p>", 
-                                    unsafe_allow_html=True
-                                )
-                                time.sleep(0.025)
-                            
-                            # Traitement réel
-                            prediction, confidence, error = process_image_prediction(image, models['detection_model'])
-                            
                             if error:
                                 st.error(f"❌ Erreur lors de l'analyse: {error}")
                             else:
                                 # Sauvegarder les résultats
-                                st.session_state.prediction_result = prediction
-                                st.session_state.confidence_score = confidence
-                                st.session_state.analyzed_image_hash = current_image_hash
+                                st.session_state.prediction_results = predictions
+                                st.session_state.confidence_scores = confidences
+                                st.session_state.analyzed_image_hashes = current_image_hashes
                                 st.session_state.analysis_done = True
                                 st.session_state.analysis_timestamp = datetime.now()
                                 
-                                # Nettoyer l'interface
-                                progress_bar.empty()
-                                status_text.empty()
-                                analysis_container.empty()
+                                # HTML des résultats figé une fois pour toutes les réexécutions
+                                st.session_state.result_html = [
+                                    build_detection_html(uploaded_file.name, image_size, prediction, confidence,
+                                                         st.session_state.analysis_timestamp, elapsed)
+                                    for uploaded_file, (_, image_size, _), prediction, confidence
+                                    in zip(uploaded_files, previews, predictions, confidences)
+                                ]
                                 
-                                # Rerun pour afficher les résultats
-                                st.rerun()
+                                # Nettoyer l'interface de lancement
+                                launch_placeholder.empty()
             
-            # Affichage des résultats
-            else:
-                prediction = st.session_state.prediction_result
-                confidence = st.session_state.confidence_score
-                timestamp = st.session_state.analysis_timestamp
-                
-                st.markdown("---")
-                
-                # Résultats principaux
-                col1, col2 = st.columns([3, 2])
-                
-                with col1:
-                    if prediction >= 0.5:
-                        st.markdown(f"""
-                        <div class="result-card result-positive">
-                            🚨 <strong>DÉTECTION POSITIVE</strong><br><br>
-                            <span style="font-size: 1.2rem;">Parasites de malaria détectés</span><br>
-                            <span style="font-size: 1rem; opacity: 0.9;">Score de prédiction: {prediction:.3f}</span><br><br>
-                            <strong style="font-size: 1.4rem;">⚡ CONSULTATION MÉDICALE URGENTE RECOMMANDÉE</strong><br><br>
-                            <span style="font-size: 0.9rem;">Analyse effectuée le {timestamp.strftime('%d/%m/%Y à %H:%M')}</span>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"""
-                        <div class="result-card result-negative">
-                            ✅ <strong>RÉSULTAT NÉGATIF</strong><br><br>
-                            <span style="font-size: 1.2rem;">Aucun parasite détecté</span><br>
-                            <span style="font-size: 1rem; opacity: 0.9;">Score de prédiction: {prediction:.3f}</span><br><br>
-                            <strong style="font-size: 1.4rem;">✨ Cellules d'apparence normale</strong><br><br>
-                            <span style="font-size: 0.9rem;">Analyse effectuée le {timestamp.strftime('%d/%m/%Y à %H:%M')}</span>
-                        </div>
-                        """, unsafe_allow_html=True)
-                
-                with col2:
-                    # Gauge de confiance
-                    fig = create_confidence_gauge(confidence)
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Métriques détaillées
-                st.markdown("""
-                <div class="premium-card">
-                    <h3 class="card-title" style="text-align: center;">📊 Analyse Détaillée</h3>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                col1, col2, col3, col4 = st.columns(4)
-                
-                metrics = [
-                    ("📈 Score IA", f"{prediction:.4f}", "#2563eb"),
-                    ("🎯 Confiance", f"{confidence:.1%}", "#059669"),
-                    ("📏 Résolution", f"{image.size[0]}×{image.size[1]}", "#d97706"),
-                    ("⚡ Temps", "2.1s", "#7c3aed")
-                ]
-                
-                for col, (label, value, color) in zip([col1, col2, col3, col4], metrics):
-                    with col:
-                        st.markdown(f"""
-                        <div class="metric-card">
-                            <div class="metric-label">{label}</div>
-                            <div class="metric-value" style="color: {color};">{value}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                
-                # Actions
-                st.markdown("---")
-                col1, col2, col3 = st.columns([1, 1, 1])
-                
-                with col1:
-                    if st.button("🔄 Nouvelle Analyse", use_container_width=True):
-                        reset_analysis_state()
-                        st.rerun()
-                
-                with col2:
-                    if st.button("📱 Partager Résultat", use_container_width=True):
-                        st.success("🎉 Fonctionnalité de partage en développement!")
-                
-                with col3:
-                    if st.button("📋 Exporter Rapport", use_container_width=True):
-                        st.info("📄 Export PDF disponible prochainement!")
+            # Affichage des résultats, dans la même exécution que l'analyse
+            if st.session_state.analysis_done:
+                render_detection_results()
         
         except Exception as e:
             st.error(f"❌ Erreur lors du traitement de l'image: {str(e)}")
@@ -813,29 +820,14 @@ if selected_feature == "🔬 Détection par Image":
 # ==================== MODULE PREVISION CLIMATIQUE ====================
 
 elif selected_feature == "🌍 Prévision Climatique":
-    st.markdown("""
-    <div class="premium-card">
-        <h2 class="card-title" style="text-align: center;">🌍 Module de Prévision Épidémiologique</h2>
-        <p class="card-text" style="text-align: center;">
-            Système de prédiction avancé utilisant <span class="highlight">XGBoost</span> et des <span class="highlight">données climatiques</span> 
-            pour estimer la propagation de la malaria
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FORECAST_HEADER_HTML, unsafe_allow_html=True)
     
     if not models['forecast_loaded']:
         st.error("🚨 Le modèle de prévision n'est pas disponible. Vérifiez l'installation des fichiers.")
         st.stop()
     
     # Interface de saisie
-    st.markdown("""
-    <div class="premium-card">
-        <h3 class="card-title" style="text-align: center;">📝 Configuration des Paramètres</h3>
-        <p class="card-text" style="text-align: center;">
-            Saisissez les données climatiques et épidémiologiques pour générer une prévision précise
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(FORECAST_SETUP_HTML, unsafe_allow_html=True)
     
     # Paramètres organisés en colonnes
     col1, col2, col3 = st.columns(3)
@@ -852,188 +844,72 @@ elif selected_feature == "🌍 Prévision Climatique":
         st.markdown('<div class="premium-card">', unsafe_allow_html=True)
         st.markdown("### 🏥 Données Épidémiologiques")
         previous_cases = st.slider("🧾 Cas Précédents", 0, 200, 20, 1, help="Nombre de cas du mois précédent")
-        population = st.selectbox("👥 Taille Population", ["Petite (<50k)", "Moyenne (50k-200k)", "Grande (>200k)"], help="Taille de la population locale")
+        population = st.selectbox("👥 Taille Population", POPULATION_SIZES, help="Taille de la population locale")
         healthcare_index = st.slider("🏥 Qualité Santé", 1, 10, 5, 1, help="Indice qualité des soins (1=faible, 10=excellent)")
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col3:
         st.markdown('<div class="premium-card">', unsafe_allow_html=True)
         st.markdown("### 🌍 Localisation")
-        country = st.selectbox("🌍 Pays", ["Senegal", "Mali", "Guinea", "Ivory Coast", "Burkina Faso"], help="Pays d'analyse")
-        
-        city_options = {
-            "Senegal": ["Dakar", "Thies", "Saint-Louis", "Ziguinchor"],
-            "Mali": ["Bamako", "Sikasso", "Kayes", "Mopti"],
-            "Guinea": ["Conakry", "Nzerekore", "Kindia", "Labe"],
-            "Ivory Coast": ["Abidjan", "Yamoussoukro", "Bouake", "Daloa"],
-            "Burkina Faso": ["Ouagadougou", "Bobo-Dioulasso", "Koudougou", "Banfora"]
-        }
-        
-        city = st.selectbox("🏙️ Ville", city_options[country], help="Ville spécifique")
-        month = st.selectbox("🗓️ Mois", ["Mai", "Juin", "Juillet", "Août", "Septembre", "Octobre"], help="Mois de prévision")
+        # Les listes déroulantes renvoient directement les codes attendus par le modèle
+        country_code = st.selectbox("🌍 Pays", range(len(ALL_COUNTRIES)), format_func=ALL_COUNTRIES.__getitem__, help="Pays d'analyse")
+        city_code = st.selectbox("🏙️ Ville", CITY_CODES[country_code], format_func=ALL_CITIES.__getitem__, help="Ville spécifique")
+        month_code = st.selectbox("🗓️ Mois", range(len(ALL_MONTHS)), format_func=ALL_MONTHS.__getitem__, help="Mois de prévision")
         st.markdown('</div>', unsafe_allow_html=True)
     
-    # Bouton de prévision
-    if st.button("🔮 Générer la Prévision", use_container_width=True, type="primary"):
+    # Bouton de prévision ; un clic sur des paramètres inchangés garde la prévision affichée
+    forecast_key = (country_code, city_code, month_code, temperature, humidity, rainfall, previous_cases, population, healthcare_index)
+    if (st.button("🔮 Générer la Prévision", use_container_width=True, type="primary")
+            and forecast_key != st.session_state.last_forecast_key):
         try:
-            # Mappings
-            month_map = {"Mai": 0, "Juin": 1, "Juillet": 2, "Août": 3, "Septembre": 4, "Octobre": 5}
-            all_cities = ["Dakar", "Thies", "Saint-Louis", "Ziguinchor", "Bamako", "Sikasso", "Kayes", "Mopti",
-                         "Conakry", "Nzerekore", "Kindia", "Labe", "Abidjan", "Yamoussoukro", "Bouake", "Daloa",
-                         "Ouagadougou", "Bobo-Dioulasso", "Koudougou", "Banfora"]
-            city_map = {c: i for i, c in enumerate(all_cities)}
-            country_map = {"Senegal": 0, "Mali": 1, "Guinea": 2, "Ivory Coast": 3, "Burkina Faso": 4}
-            
-            # Animation de traitement
+            # Un seul appel (mémoïsé) au modèle pour tous les mois ; le spinner ne couvre que le calcul réel
             with st.spinner("🧠 Calcul de la prévision en cours..."):
-                time.sleep(1.5)
-            
-            # Préparation des données
-            input_data = [[
-                country_map[country], city_map[city], month_map[month],
-                temperature, humidity, rainfall, previous_cases
-            ]]
-            
-            # Prédiction
-            base_prediction = models['forecast_model'].predict(input_data)[0]
-            population_factor = {"Petite (<50k)": 0.7, "Moyenne (50k-200k)": 1.0, "Grande (>200k)": 1.5}[population]
+                monthly_base = forecast_months(
+                    models['forecast_model'],
+                    country_code, city_code,
+                    temperature, humidity, rainfall, previous_cases
+                )
+            base_prediction = monthly_base[month_code]
+            population_factor = POP_FACTOR[population]
             healthcare_factor = 1.2 - (healthcare_index / 10)
             
-            final_prediction = max(0, int(base_prediction * population_factor * healthcare_factor))
+            final_prediction = scale_case(base_prediction, population_factor, healthcare_factor)
+            monthly_cases = scale_cases(monthly_base, population_factor, healthcare_factor)
             
             # Sauvegarder dans session state
             st.session_state.forecast_result = {
                 'prediction': final_prediction,
-                'city': city,
-                'country': country,
-                'month': month,
+                'monthly_cases': tuple(monthly_cases.tolist()),
+                'city': ALL_CITIES[city_code],
+                'country': ALL_COUNTRIES[country_code],
+                'month': ALL_MONTHS[month_code],
+                'risk_values': radar_values(temperature, humidity, rainfall, previous_cases),
+                'confidence_score': min(95, 75 + (healthcare_index * 2)),
                 'timestamp': datetime.now()
             }
             st.session_state.forecast_done = True
-            
-            st.rerun()
+            st.session_state.last_forecast_key = forecast_key
             
         except Exception as e:
             st.error(f"❌ Erreur lors de la prévision: {str(e)}")
     
-    # Affichage des résultats de prévision
+    # Affichage des résultats de prévision, dans la même exécution que le calcul
     if st.session_state.forecast_done and st.session_state.forecast_result:
-        result = st.session_state.forecast_result
-        
-        st.markdown("---")
-        
-        col1, col2 = st.columns([2, 3])
-        
-        with col1:
-            risk_level = "Faible" if result['prediction'] < 20 else "Modéré" if result['prediction'] < 50 else "Élevé"
-            st.markdown(f"""
-            <div class="result-card result-forecast">
-                🌍 <strong>PRÉVISION ÉPIDÉMIOLOGIQUE</strong><br><br>
-                <strong>{result['city']}, {result['country']}</strong><br>
-                <strong>Mois: {result['month']}</strong><br><br>
-                <span style="font-size: 3.5rem; font-weight: 800;">{result['prediction']}</span><br>
-                <span style="font-size: 1.2rem;">cas estimés de malaria 🦠</span><br><br>
-                <strong>Niveau de Risque: {risk_level}</strong><br><br>
-                <span style="font-size: 0.9rem;">Prévision générée le {result['timestamp'].strftime('%d/%m/%Y à %H:%M')}</span>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            # Graphique radar des facteurs
-            risk_factors = ['Température', 'Humidité', 'Précipitations', 'Cas Précédents']
-            risk_values = [
-                min(temperature / 40 * 100, 100),
-                humidity,
-                min(rainfall / 300 * 100, 100),
-                min(previous_cases / 100 * 100, 100)
-            ]
-            
-            fig = go.Figure(data=go.Scatterpolar(
-                r=risk_values,
-                theta=risk_factors,
-                fill='toself',
-                fillcolor='rgba(37, 99, 235, 0.3)',
-                line=dict(color='#2563eb', width=4),
-                name='Facteurs de Risque'
-            ))
-            
-            fig.update_layout(
-                polar=dict(
-                    radialaxis=dict(
-                        visible=True, range=[0, 100],
-                        tickfont=dict(color='#1f2937', size=12),
-                        gridcolor='#e5e7eb'
-                    ),
-                    angularaxis=dict(
-                        tickfont=dict(color='#1f2937', size=14, family='Inter'),
-                        rotation=90
-                    )
-                ),
-                showlegend=False,
-                title={'text': "🎯 Analyse des Facteurs de Risque", 'x': 0.5, 'font': {'color': '#1f2937', 'size': 18, 'family': 'Inter'}},
-                paper_bgcolor='rgba(248, 250, 252, 0.95)',
-                plot_bgcolor='rgba(248, 250, 252, 0.95)',
-                height=350
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Actions de prévision
-        st.markdown("---")
-        col1, col2, col3 = st.columns([1, 1, 1])
-        
-        with col1:
-            if st.button("🔄 Nouvelle Prévision", use_container_width=True):
-                reset_forecast_state()
-                st.rerun()
-        
-        with col2:
-            confidence_score = min(95, 75 + (healthcare_index * 2))
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-label">🎯 Confiance du Modèle</div>
-                <div class="metric-value" style="color: #2563eb;">{confidence_score}%</div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-label">📊 Précision Historique</div>
-                <div class="metric-value" style="color: #059669;">89.2%</div>
-            </div>
-            """, unsafe_allow_html=True)
+        render_forecast_results(st.session_state.forecast_result)
 
 # ==================== DASHBOARD ANALYTICS ====================
 
 elif selected_feature == "📊 Dashboard Analytics":
-    st.markdown("""
-    <div class="premium-card">
-        <h2 class="card-title" style="text-align: center;">📊 Dashboard Analytics Avancé</h2>
-        <p class="card-text" style="text-align: center;">
-            Surveillance en temps réel des performances et métriques du système d'intelligence artificielle
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(DASHBOARD_HEADER_HTML, unsafe_allow_html=True)
     
-    # Métriques principales
-    col1, col2, col3, col4 = st.columns(4)
+    # Métriques principales (données statiques préparées au premier affichage de la session)
+    if '_dashboard_static' not in st.session_state:
+        st.session_state._dashboard_static = build_dashboard_static()
+    dashboard_static = st.session_state._dashboard_static
     
-    dashboard_metrics = [
-        ("🔬 Images Analysées", "1,387", "#2563eb"),
-        ("🎯 Précision Globale", "96.8%", "#059669"),
-        ("🌍 Prévisions Générées", "1,042", "#d97706"),
-        ("🏥 Cas Détectés", "189", "#dc2626")
-    ]
-    
-    for col, (label, value, color) in zip([col1, col2, col3, col4], dashboard_metrics):
+    for col, metric_html in zip(st.columns(4), dashboard_static['metrics_html']):
         with col:
-            st.markdown(f"""
-            <div class="metric-card">
-                <div class="metric-label">{label}</div>
-                <div class="metric-value" style="color: {color};">{value}</div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(metric_html, unsafe_allow_html=True)
     
     # Graphiques analytics
     col1, col2 = st.columns(2)
@@ -1042,76 +918,24 @@ elif selected_feature == "📊 Dashboard Analytics":
         st.markdown('<div class="premium-card">', unsafe_allow_html=True)
         st.markdown("### 📈 Évolution des Détections")
         
-        months = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Juin']
-        positive_cases = [52, 41, 63, 48, 44, 51]
-        negative_cases = [168, 175, 159, 172, 169, 163]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=months, y=positive_cases, mode='lines+markers', name='Cas Positifs', line=dict(color='#dc2626', width=4), marker=dict(size=10)))
-        fig.add_trace(go.Scatter(x=months, y=negative_cases, mode='lines+markers', name='Cas Négatifs', line=dict(color='#059669', width=4), marker=dict(size=10)))
-        
-        fig.update_layout(
-            paper_bgcolor='rgba(248, 250, 252, 0.95)',
-            plot_bgcolor='rgba(248, 250, 252, 0.95)',
-            font={'color': '#1f2937', 'family': 'Inter'},
-            height=320,
-            margin=dict(t=20, b=20, l=20, r=20),
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_detection_trend_figure(), use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
     with col2:
         st.markdown('<div class="premium-card">', unsafe_allow_html=True)
         st.markdown("### 🌍 Répartition Géographique")
         
-        countries = ['Sénégal', 'Mali', 'Guinée', 'Côte d\'Ivoire', 'Burkina Faso']
-        cases = [342, 289, 218, 267, 192]
-        
-        fig = go.Figure(data=[go.Pie(
-            labels=countries, values=cases, hole=0.5,
-            marker_colors=['#2563eb', '#059669', '#d97706', '#dc2626', '#7c3aed'],
-            textinfo='label+percent', textfont_size=12
-        )])
-        
-        fig.update_layout(
-            paper_bgcolor='rgba(248, 250, 252, 0.95)',
-            plot_bgcolor='rgba(248, 250, 252, 0.95)',
-            font={'color': '#1f2937', 'family': 'Inter'},
-            height=320,
-            margin=dict(t=20, b=20, l=20, r=20)
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_geo_figure(), use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
     # Tableau de performance
     st.markdown('<div class="premium-card">', unsafe_allow_html=True)
     st.markdown("### 📊 Performance des Modèles IA")
     
-    performance_data = {
-        'Modèle': ['CNN MobileNet', 'XGBoost Forecast', 'Ensemble Hybrid'],
-        'Précision': ['96.8%', '89.2%', '93.1%'],
-        'Rappel': ['95.4%', '86.7%', '91.3%'],
-        'F1-Score': ['96.1%', '87.9%', '92.2%'],
-        'Temps d\'Exécution': ['2.1s', '1.8s', '3.9s'],
-        'Statut': ['🟢 Actif', '🟢 Actif', '🟡 Test']
-    }
-    
-    df = pd.DataFrame(performance_data)
-    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.dataframe(dashboard_static['performance'], use_container_width=True, hide_index=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ==================== FOOTER ====================
 
 st.markdown("---")
-st.markdown("""
-<div class="premium-card" style="margin-top: 2rem;">
-    <p class="card-text" style="text-align: center; font-size: 0.95rem;">
-        <span class="highlight">🔬 Malaria AI Detective</span> - Développé avec   CHE .<br>
-        <strong>Version 2.0 </strong> | Intelligence Artificielle de Pointe | Diagnostics Ultra-Précis | 
-        <span style="color: var(--success);">Sur la base des expériences internationales, nous visons à promouvoir le développement de la Mauritanie</span>
-    </p>
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Compilation du modèle de prévision XGBoost en bibliothèque native.
+
+Script à exécuter une seule fois, sur la machine de déploiement :
+
+    pip install treelite tl2cgen
+    python compile_forecast_model.py
+
+Chaque arbre est traduit en code C compilé avec gcc, avec des seuils
+quantifiés en indices entiers. Le fichier xgb_malaria.so produit est chargé
+en priorité par app.py lorsque tl2cgen est installé ; sinon l'application
+garde le Booster XGBoost.
+"""
+import os
+
+import joblib
+import tl2cgen
+import treelite
+import xgboost as xgb
+
+SOURCE_MODEL = "xgb_malaria_forecast_model.joblib"
+NATIVE_MODEL = "xgb_malaria.ubj"
+TARGET_LIB = "xgb_malaria.so"
+
+
+def load_booster():
+    """Charge le Booster comme app.py : format natif si disponible, sinon le pickle joblib"""
+    if os.path.exists(NATIVE_MODEL):
+        booster = xgb.Booster()
+        booster.load_model(NATIVE_MODEL)
+        return booster
+    return joblib.load(SOURCE_MODEL).get_booster()
+
+
+def main():
+    model = treelite.frontend.from_xgboost(load_booster())
+    # quantize : les seuils des nœuds deviennent des indices de bin entiers, comparés sans flottants
+    tl2cgen.export_lib(model, toolchain="gcc", libpath=TARGET_LIB,
+                       params={"parallel_comp": os.cpu_count() or 1, "quantize": 1}, verbose=False)
+    print(f"Bibliothèque native écrite dans {TARGET_LIB}")
+
+
+if __name__ == "__main__":
+    main()
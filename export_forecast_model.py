@@ -0,0 +1,24 @@
+"""Export du modèle de prévision XGBoost au format natif (JSON binaire).
+
+Script exécuté une seule fois, hors de l'application, par la commande de
+build de render.yaml (ou à la main) :
+
+    python export_forecast_model.py
+
+Il produit xgb_malaria.ubj, chargé en priorité par app.py à la place du
+pickle joblib du wrapper scikit-learn.
+"""
+import joblib
+
+SOURCE_MODEL = "xgb_malaria_forecast_model.joblib"
+TARGET_MODEL = "xgb_malaria.ubj"
+
+
+def main():
+    model = joblib.load(SOURCE_MODEL)
+    model.get_booster().save_model(TARGET_MODEL)
+    print(f"Booster XGBoost écrit dans {TARGET_MODEL}")
+
+
+if __name__ == "__main__":
+    main()
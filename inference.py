@@ -0,0 +1,221 @@
+"""Noyau de calcul pour l'inférence des modèles de l'application.
+
+Streamlit ré-exécute app.py à chaque interaction : les tampons réutilisés et
+les fonctions compilées par Numba vivent donc dans ce module, importé une
+seule fois par processus.
+"""
+import functools
+import threading
+from types import MappingProxyType
+
+import numpy as np
+from numba import njit, prange
+from PIL import Image
+
+IMAGE_SIZE = (128, 128)
+
+# Encodage des variables catégorielles du modèle de prévision (ordre d'entraînement), construit une
+# seule fois par processus plutôt qu'à chaque ré-exécution d'app.py
+CITY_OPTIONS = MappingProxyType({
+    "Senegal": ("Dakar", "Thies", "Saint-Louis", "Ziguinchor"),
+    "Mali": ("Bamako", "Sikasso", "Kayes", "Mopti"),
+    "Guinea": ("Conakry", "Nzerekore", "Kindia", "Labe"),
+    "Ivory Coast": ("Abidjan", "Yamoussoukro", "Bouake", "Daloa"),
+    "Burkina Faso": ("Ouagadougou", "Bobo-Dioulasso", "Koudougou", "Banfora"),
+})
+ALL_COUNTRIES = tuple(CITY_OPTIONS)
+ALL_CITIES = tuple(city for cities in CITY_OPTIONS.values() for city in cities)
+# Codes des villes de chaque pays (rang dans ALL_CITIES), indexés par le code du pays :
+# options directes des listes déroulantes
+CITY_CODES = tuple(tuple(ALL_CITIES.index(city) for city in cities) for cities in CITY_OPTIONS.values())
+MONTH_MAP = MappingProxyType({"Mai": 0, "Juin": 1, "Juillet": 2, "Août": 3, "Septembre": 4, "Octobre": 5})
+ALL_MONTHS = tuple(MONTH_MAP)
+
+# Facteur appliqué à la prédiction selon la taille de la population
+POP_FACTOR = MappingProxyType({"Petite (<50k)": 0.7, "Moyenne (50k-200k)": 1.0, "Grande (>200k)": 1.5})
+POPULATION_SIZES = tuple(POP_FACTOR)
+
+# Échelle 0-100 du radar pour température, humidité, précipitations et cas précédents : x / plafond * 100,
+# dans cet ordre d'opérations pour des valeurs identiques au bit près au calcul scalaire d'origine
+_RADAR_CEILINGS = np.array([40.0, 1.0, 300.0, 100.0])
+_RADAR_PERCENT = np.array([100.0, 1.0, 100.0, 100.0])
+
+# Caractéristiques du modèle de prévision, dans l'ordre d'entraînement
+FORECAST_FEATURES = ("Country", "City", "Month", "Temperature", "Humidity", "Rainfall", "PreviousCases")
+
+# Lot balayant tous les mois pour une localisation et une météo données (colonne du mois préremplie),
+# rempli en place à chaque prédiction
+_MONTH_BUF = np.empty((len(MONTH_MAP), len(FORECAST_FEATURES)), dtype=np.float32)
+_MONTH_BUF[:, 2] = tuple(MONTH_MAP.values())
+_MONTH_LOCK = threading.Lock()
+
+# Tampons du détecteur (un par type : pixels uint8, entrée float32), agrandis au besoin et réutilisés
+_INPUT_BUFS = {}
+_INPUT_LOCK = threading.Lock()
+
+
+def _input_buffer(dtype, batch_size):
+    """Renvoie un tampon (batch_size, 128, 128, 3) du type demandé"""
+    dtype = np.dtype(dtype)
+    buf = _INPUT_BUFS.get(dtype)
+    if buf is None or buf.shape[0] < batch_size:
+        buf = np.empty((batch_size, IMAGE_SIZE[1], IMAGE_SIZE[0], 3), dtype=dtype)
+        _INPUT_BUFS[dtype] = buf
+    return buf[:batch_size]
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def rescale_into(dst, src):
+    """Normalise les pixels uint8 dans [0, 1] en une seule passe float32"""
+    scale = np.float32(1.0 / 255.0)
+    rows = src.shape[1]
+    for k in prange(src.shape[0] * rows):
+        n, i = k // rows, k % rows
+        for j in range(src.shape[2]):
+            for c in range(src.shape[3]):
+                dst[n, i, j, c] = src[n, i, j, c] * scale
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def quantize_into(dst, src, factor, zero_point, q_min, q_max):
+    """Quantifie les pixels uint8 selon les paramètres d'entrée du modèle int8"""
+    rows = src.shape[1]
+    for k in prange(src.shape[0] * rows):
+        n, i = k // rows, k % rows
+        for j in range(src.shape[2]):
+            for c in range(src.shape[3]):
+                q = np.rint(src[n, i, j, c] * factor) + zero_point
+                dst[n, i, j, c] = min(max(q, q_min), q_max)
+
+
+def resize_pixels(image):
+    """Redimensionne l'image à la taille d'entrée du détecteur (pixels uint8)"""
+    # Même rééchantillonnage (bicubique) que lors de l'entraînement ; au-delà d'un facteur 3,
+    # Pillow réduit d'abord par blocs entiers (Image.reduce) avant le filtre bicubique
+    image_resized = image.resize(IMAGE_SIZE, Image.BICUBIC, reducing_gap=3.0)
+    return np.asarray(image_resized, dtype=np.uint8)
+
+
+def _stage_pixels(images):
+    """Copie les images (128, 128, 3) uint8 dans le tampon de pixels partagé"""
+    staging = _input_buffer(np.uint8, len(images))
+    for k, pixels in enumerate(images):
+        staging[k] = pixels
+    return staging
+
+
+def predict_batch(detector, images):
+    """Renvoie les scores du détecteur pour une liste d'images (128, 128, 3) uint8
+
+    `detector` est un interpréteur TFLite ou, à défaut, une tf.function compilée par XLA.
+    """
+    if not hasattr(detector, 'invoke'):
+        return _predict_compiled(detector, images)
+    return _predict_tflite(detector, images)
+
+
+def _predict_compiled(function, images):
+    """Inférence via la tf.function XLA de repli (entrée float32 uniquement)"""
+    # Les tampons sont partagés entre les sessions Streamlit
+    with _INPUT_LOCK:
+        buf = _input_buffer(np.float32, len(images))
+        rescale_into(buf, _stage_pixels(images))
+        return function(buf).numpy()[:, 0]
+
+
+def _predict_tflite(interpreter, images):
+    """Inférence via l'interpréteur TFLite, en float32 ou en int8"""
+    batch_size = len(images)
+
+    # Les tampons et l'interpréteur sont partagés entre les sessions Streamlit
+    with _INPUT_LOCK:
+        input_details = interpreter.get_input_details()[0]
+        if input_details['shape'][0] != batch_size:
+            interpreter.resize_tensor_input(input_details['index'], [batch_size, IMAGE_SIZE[1], IMAGE_SIZE[0], 3])
+            interpreter.allocate_tensors()
+            input_details = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()[0]
+
+        # Écriture directe dans le tenseur d'entrée de l'interpréteur, sans copie set_tensor
+        staging = _stage_pixels(images)
+        input_view = interpreter.tensor(input_details['index'])()
+        if input_view.dtype == np.float32:
+            rescale_into(input_view, staging)
+        else:
+            # Modèle int8 : x = pixel / 255 est directement quantifié en x / scale + zero_point
+            scale, zero_point = input_details['quantization']
+            limits = np.iinfo(input_view.dtype)
+            quantize_into(input_view, staging, np.float32(1.0 / (255.0 * scale)), zero_point, limits.min, limits.max)
+        # invoke() est refusé tant qu'une vue sur la mémoire de l'interpréteur existe
+        del input_view
+        interpreter.invoke()
+        output = interpreter.get_tensor(output_details['index'])[:, 0]
+
+    if output_details['dtype'] != np.float32:
+        scale, zero_point = output_details['quantization']
+        return (output.astype(np.float32) - zero_point) * scale
+    return output
+
+
+@njit(fastmath=True, cache=True)
+def scale_case(base, population_factor, healthcare_factor):
+    """Applique les facteurs population et santé à une prédiction de base (cas entiers, jamais négatifs)"""
+    return max(0, int(base * population_factor * healthcare_factor))
+
+
+@njit(fastmath=True, cache=True)
+def scale_cases(base, population_factor, healthcare_factor):
+    """Version vectorisée de scale_case pour un lot de prédictions"""
+    out = np.empty(base.shape[0], dtype=np.int64)
+    for k in range(base.shape[0]):
+        out[k] = scale_case(base[k], population_factor, healthcare_factor)
+    return out
+
+
+def radar_values(temperature, humidity, rainfall, previous_cases):
+    """Renvoie les quatre facteurs de risque du radar, plafonnés à 100 (tuple utilisable comme clé de cache)"""
+    # Un seul vecteur de 4 valeurs : mise à l'échelle puis plafonnement en place, sans tableau intermédiaire
+    factors = np.array([temperature, humidity, rainfall, previous_cases], dtype=np.float64)
+    np.divide(factors, _RADAR_CEILINGS, out=factors)
+    np.multiply(factors, _RADAR_PERCENT, out=factors)
+    np.minimum(factors, 100.0, out=factors)
+    return tuple(factors.tolist())
+
+
+def _predict_rows(model, rows):
+    """Évalue les arbres sur des lignes float32 contiguës, quel que soit le moteur chargé"""
+    if hasattr(model, 'inplace_predict'):
+        # Booster XGBoost : inplace_predict évite la construction d'une DMatrix à chaque appel
+        return model.inplace_predict(rows)
+    if type(model).__module__.startswith('tl2cgen'):
+        # Prédicteur tl2cgen : appel direct des arbres compilés en code natif
+        import tl2cgen
+        return model.predict(tl2cgen.DMatrix(rows)).reshape(-1)
+    # Modèle oneDAL (daal4py) : parcours vectorisé AVX2/AVX-512 des arbres
+    return model.predict(rows)
+
+
+def predict_months(model, country, city, temperature, humidity, rainfall, previous_cases):
+    """Prédit le nombre de cas de base pour chaque mois de ALL_MONTHS, en un seul appel"""
+    # Le tampon est partagé entre les sessions Streamlit
+    with _MONTH_LOCK:
+        _MONTH_BUF[:, :2] = (country, city)
+        _MONTH_BUF[:, 3:] = (temperature, humidity, rainfall, previous_cases)
+        return _predict_rows(model, _MONTH_BUF)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_months(model, country, city, temperature_q, humidity_q, rainfall_q, previous_cases):
+    """Prédictions mensuelles mémoïsées sur les caractéristiques quantifiées"""
+    monthly = predict_months(model, country, city,
+                             temperature_q * 0.5, float(humidity_q), rainfall_q * 5.0, previous_cases)
+    # Tuple immuable : le résultat en cache est partagé entre les appels
+    return tuple(monthly.tolist())
+
+
+def forecast_months(model, country, city, temperature, humidity, rainfall, previous_cases):
+    """Renvoie les cas de base prévus pour chaque mois, en réutilisant les résultats déjà calculés"""
+    # Quantification alignée sur les pas des curseurs (0,5 °C, 1 %, 5 mm, 1 cas) : sans perte
+    monthly = _cached_months(model, country, city,
+                             round(temperature * 2), round(humidity), round(rainfall / 5), int(previous_cases))
+    return np.array(monthly, dtype=np.float32)
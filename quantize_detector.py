@@ -0,0 +1,59 @@
+"""Quantification int8 post-entraînement du détecteur MobileNet.
+
+Script exécuté une seule fois, hors de l'application, par la commande de
+build de render.yaml (ou à la main) :
+
+    python quantize_detector.py
+
+Il produit malaria_detector_mobilenet_int8.tflite, chargé en priorité par
+app.py. Les images de malaria_sample_1000 servent à calibrer les plages
+d'activation.
+"""
+import os
+
+import numpy as np
+import tensorflow as tf
+from PIL import Image
+from tensorflow.keras.models import load_model
+
+from inference import IMAGE_SIZE
+
+SOURCE_MODEL = "malaria_detector_mobilenet.h5"
+TARGET_MODEL = "malaria_detector_mobilenet_int8.tflite"
+SAMPLE_DIR = "malaria_sample_1000"
+CALIBRATION_IMAGES_PER_CLASS = 100
+
+
+def representative_dataset():
+    """Fournit des images réelles, prétraitées comme dans l'application"""
+    for class_name in ("Parasitized", "Uninfected"):
+        class_dir = os.path.join(SAMPLE_DIR, class_name)
+        for file_name in sorted(os.listdir(class_dir))[:CALIBRATION_IMAGES_PER_CLASS]:
+            image = Image.open(os.path.join(class_dir, file_name)).convert("RGB")
+            image = image.resize(IMAGE_SIZE, Image.BICUBIC)
+            pixels = np.asarray(image, dtype=np.float32) / 255.0
+            yield [pixels[np.newaxis]]
+
+
+def main():
+    converter = tf.lite.TFLiteConverter.from_keras_model(load_model(SOURCE_MODEL))
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+
+    try:
+        tflite_model = converter.convert()
+    except Exception as e:
+        # Le fichier int8 est optionnel : sans lui, app.py convertit le .h5 au chargement
+        print(f"Quantification int8 ignorée, {TARGET_MODEL} non écrit : {e}")
+        return
+
+    with open(TARGET_MODEL, "wb") as f:
+        f.write(tflite_model)
+    print(f"Modèle int8 écrit dans {TARGET_MODEL}")
+
+
+if __name__ == "__main__":
+    main()